@@ -12,7 +12,7 @@ Notes:
 - Default behavior does NOT steal focus. Use --focus if you want the window focused.
 - Requires Python 3.10+ (uses modern type syntax).
 Usage:
-    python always_on_top.py [--persist] [--focus]
+    python always_on_top.py [--persist] [--focus] [--no-app-names]
 """
 
 import os
@@ -21,25 +21,150 @@ import time
 import platform
 import shutil
 import argparse
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import lru_cache
+from operator import attrgetter
 
-# Optional: nicer process names; skipped if not available.
-try:
-    import psutil  # type: ignore[reportMissingImports]
-except Exception:
-    psutil = None  # type: ignore[assignment]
+# Optional: nicer process names; imported on first use, skipped if not available.
+_psutil = None
+_psutil_tried = False
+
+def _get_psutil():
+    global _psutil, _psutil_tried
+    if not _psutil_tried:
+        _psutil_tried = True
+        try:
+            import psutil  # type: ignore[reportMissingImports]
+            _psutil = psutil
+        except Exception:
+            _psutil = None
+    return _psutil
+
+# Optional: direct X11 access on Linux via python-xlib; imported on first use,
+# the wmctrl CLI is used if not available.
+_xlib = None
+_xlib_tried = False
+
+def _get_xlib():
+    global _xlib, _xlib_tried
+    if not _xlib_tried:
+        _xlib_tried = True
+        try:
+            import Xlib.X  # type: ignore[reportMissingImports]
+            import Xlib.Xatom  # type: ignore[reportMissingImports]
+            import Xlib.display  # type: ignore[reportMissingImports]
+            import Xlib.protocol.event  # type: ignore[reportMissingImports]
+            _xlib = Xlib
+        except Exception:
+            _xlib = None
+    return _xlib
 
 SYSTEM = platform.system()
 
+# Win32 signatures (resolved once at import; Windows only)
+if SYSTEM == "Windows":
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+
+    HWND_TOPMOST = wintypes.HWND(-1)
+    HWND_NOTOPMOST = wintypes.HWND(-2)
+    SWP_NOSIZE = 0x0001
+    SWP_NOMOVE = 0x0002
+    SWP_SHOWWINDOW = 0x0040
+    SW_SHOWNOACTIVATE = 4
+    GWL_EXSTYLE = -20
+    WS_EX_TOPMOST = 0x00000008
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    STILL_ACTIVE = 259
+    SYNCHRONIZE = 0x00100000
+    WAIT_OBJECT_0 = 0x00000000
+    WAIT_FAILED = 0xFFFFFFFF
+
+    # Reused by the EnumWindows callback (EnumWindows calls it serially, never re-entrantly)
+    _TITLE_BUF = ctypes.create_unicode_buffer(512)
+    _CLS_BUF = ctypes.create_unicode_buffer(256)
+    _PID = wintypes.DWORD()
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_size_t),
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", wintypes.LONG),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", wintypes.WCHAR * 260),
+        ]
+
+    EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+    user32.EnumWindows.argtypes = [EnumWindowsProc, wintypes.LPARAM]
+    user32.EnumWindows.restype = wintypes.BOOL
+    user32.IsWindowVisible.argtypes = [wintypes.HWND]
+    user32.IsWindowVisible.restype = wintypes.BOOL
+    user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    user32.GetWindowTextW.restype = ctypes.c_int
+    user32.GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    user32.GetClassNameW.restype = ctypes.c_int
+    user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+    user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+    user32.SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_uint]
+    user32.SetWindowPos.restype = wintypes.BOOL
+    user32.SetForegroundWindow.argtypes = [wintypes.HWND]
+    user32.SetForegroundWindow.restype = wintypes.BOOL
+    user32.ShowWindow.argtypes = [wintypes.HWND, ctypes.c_int]
+    user32.ShowWindow.restype = wintypes.BOOL
+    user32.GetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int]
+    user32.GetWindowLongW.restype = ctypes.c_long
+    user32.BeginDeferWindowPos.argtypes = [ctypes.c_int]
+    user32.BeginDeferWindowPos.restype = wintypes.HANDLE
+    user32.DeferWindowPos.argtypes = [wintypes.HANDLE, wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_uint]
+    user32.DeferWindowPos.restype = wintypes.HANDLE
+    user32.EndDeferWindowPos.argtypes = [wintypes.HANDLE]
+    user32.EndDeferWindowPos.restype = wintypes.BOOL
+
+    kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.QueryFullProcessImageNameW.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+    kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    kernel32.CloseHandle.restype = wintypes.BOOL
+    kernel32.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(wintypes.FILETIME)] * 4
+    kernel32.GetProcessTimes.restype = wintypes.BOOL
+    kernel32.GetExitCodeProcess.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD)]
+    kernel32.GetExitCodeProcess.restype = wintypes.BOOL
+    kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+    kernel32.WaitForSingleObject.restype = wintypes.DWORD
+    kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    kernel32.Process32FirstW.restype = wintypes.BOOL
+    kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    kernel32.Process32NextW.restype = wintypes.BOOL
+
 @dataclass
 class WindowInfo:
-    wid: str          # Windows: HWND as string; X11: hex id; macOS: CGWindowNumber
+    wid: int | str    # Windows: HWND (int); X11: hex id (str); macOS: CGWindowNumber (int)
     title: str
     pid: int | None
     app: str | None   # process/owner name
     extra: str | None # e.g. class name (Windows)
 
+    @property
+    def sort_key(self) -> tuple[str, str]:
+        """(app, title) lower-cased, used to order window lists."""
+        return ((self.app or "").lower(), self.title.lower())
+
 def _truncate(s: str, n: int = 90) -> str:
     s = s or ""
     return s if len(s) <= n else s[:n - 1] + "…"
@@ -47,9 +172,115 @@ def _truncate(s: str, n: int = 90) -> str:
 # -------------------------
 # Utilities
 # -------------------------
-@lru_cache(maxsize=512)
+# Open process handles reused across lookups (LRU): pid -> (handle, creation time).
+# Keying by PID alone is safe: Windows does not hand a PID out again while any handle
+# to its process is open, so a cached entry always belongs to the process it was opened
+# for, even after that process has exited. A dead entry therefore only pins its PID;
+# _prune_handle_cache() releases those once per window listing instead of on every lookup.
+PROCESS_HANDLE_CACHE_SIZE = 256
+_handle_cache: OrderedDict[int, tuple[int, int]] = OrderedDict()
+
+def _process_exited(h: int) -> bool:
+    r = kernel32.WaitForSingleObject(h, 0)
+    if r != WAIT_FAILED:
+        return r == WAIT_OBJECT_0
+    # Handle without SYNCHRONIZE access (e.g. protected processes): fall back to the exit
+    # code, which keeps a process that exited with 259 (STILL_ACTIVE) until LRU eviction
+    code = wintypes.DWORD()
+    return not (kernel32.GetExitCodeProcess(h, ctypes.byref(code)) and code.value == STILL_ACTIVE)
+
+def _prune_handle_cache() -> None:
+    """
+    Close cached handles whose process has exited, releasing their PIDs.
+    """
+    for pid, (h, _) in list(_handle_cache.items()):
+        if _process_exited(h):
+            del _handle_cache[pid]
+            kernel32.CloseHandle(h)
+
+def _open_process_cached(pid: int) -> tuple[int, int] | None:
+    """
+    Return (handle, creation time) for pid, opening the process only on a cache miss.
+    """
+    entry = _handle_cache.get(pid)
+    if entry is not None:
+        _handle_cache.move_to_end(pid)
+        return entry
+    h = (kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION | SYNCHRONIZE, False, pid)
+         or kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid))
+    if not h:
+        return None
+    created, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+    if not kernel32.GetProcessTimes(h, ctypes.byref(created), ctypes.byref(exited),
+                                    ctypes.byref(kernel), ctypes.byref(user)):
+        kernel32.CloseHandle(h)
+        return None
+    entry = (h, (created.dwHighDateTime << 32) | created.dwLowDateTime)
+    _handle_cache[pid] = entry
+    if len(_handle_cache) > PROCESS_HANDLE_CACHE_SIZE:
+        _, (old_h, _) = _handle_cache.popitem(last=False)
+        kernel32.CloseHandle(old_h)
+    return entry
+
+def _win_proc_name(pid: int) -> str | None:
+    """
+    Resolve the executable name of a process directly via Win32
+    (QueryFullProcessImageNameW on a cached handle); avoids building a psutil.Process.
+    """
+    entry = _open_process_cached(pid)
+    if entry is None:
+        return None
+    buf = ctypes.create_unicode_buffer(512)
+    size = wintypes.DWORD(len(buf))
+    if not kernel32.QueryFullProcessImageNameW(entry[0], 0, buf, ctypes.byref(size)):
+        return None
+    return buf.value.rsplit("\\", 1)[-1] or None
+
+def _snapshot_pid_names() -> dict[int, str]:
+    """
+    Map PID -> executable name for all running processes using a single
+    Toolhelp32 snapshot. Returns an empty dict if the snapshot fails.
+    """
+    snap = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if not snap or snap == INVALID_HANDLE_VALUE:
+        return {}
+    names: dict[int, str] = {}
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        ok = kernel32.Process32FirstW(snap, ctypes.byref(entry))
+        while ok:
+            names[int(entry.th32ProcessID)] = entry.szExeFile
+            ok = kernel32.Process32NextW(snap, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snap)
+    return names
+
+def _proc_create_time(pid: int) -> int | None:
+    """
+    Process creation time (Windows), used to tell a reused PID apart from the original process.
+    """
+    entry = _open_process_cached(pid)
+    return entry[1] if entry else None
+
 def get_proc_name(pid: int | None) -> str | None:
-    if not pid or not psutil:
+    if not pid:
+        return None
+    pid = int(pid)
+    # On Windows the creation time comes from the cached process handle, so PID reuse is
+    # detected cheaply. Elsewhere reading it costs as much as the name lookup (a psutil.Process),
+    # so the PID alone is the cache key, as before.
+    create_time = _proc_create_time(pid) if SYSTEM == "Windows" else None
+    return _get_proc_name_cached(pid, create_time)
+
+@lru_cache(maxsize=4096)
+def _get_proc_name_cached(pid: int, create_time: int | None) -> str | None:
+    if SYSTEM == "Windows":
+        name = _win_proc_name(int(pid))
+        if name:
+            return name
+    psutil = _get_psutil()
+    if not psutil:
         return None
     try:
         return psutil.Process(int(pid)).name()
@@ -59,51 +290,65 @@ def get_proc_name(pid: int | None) -> str | None:
 # -------------------------
 # Windows-specific
 # -------------------------
-def list_windows_windows() -> list[WindowInfo]:
-    import ctypes
-    from ctypes import wintypes
+# State for the shared EnumWindows callback; swapped in by list_windows_windows().
+_enum_windows: list[WindowInfo] = []
+_enum_pid_names: dict[int, str] = {}
+_enum_app_names = True
 
-    user32 = ctypes.windll.user32
+def _enum_windows_callback(hwnd, lParam):
+    try:
+        if user32.IsWindowVisible(hwnd):
+            if user32.GetWindowTextW(hwnd, _TITLE_BUF, len(_TITLE_BUF)) > 0:
+                title = _TITLE_BUF.value.strip()
+                if title:
+                    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(_PID))
+                    pid = int(_PID.value)
+                    user32.GetClassNameW(hwnd, _CLS_BUF, len(_CLS_BUF))
+                    app = None
+                    if _enum_app_names:
+                        app = _enum_pid_names.get(pid) or get_proc_name(pid)
+                    _enum_windows.append(WindowInfo(int(hwnd), title, pid, app, _CLS_BUF.value))
+    except Exception:
+        pass
+    return True
 
-    EnumWindows = user32.EnumWindows
-    EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
-    IsWindowVisible = user32.IsWindowVisible
-    GetWindowTextW = user32.GetWindowTextW
-    GetWindowTextLengthW = user32.GetWindowTextLengthW
-    GetClassNameW = user32.GetClassNameW
-    GetWindowThreadProcessId = user32.GetWindowThreadProcessId
+if SYSTEM == "Windows":
+    # Created once: every EnumWindowsProc(...) wrap allocates a new native thunk
+    _ENUM_PROC = EnumWindowsProc(_enum_windows_callback)
 
+def list_windows_windows(app_names: bool = True) -> list[WindowInfo]:
+    global _enum_windows, _enum_pid_names, _enum_app_names
     windows: list[WindowInfo] = []
-
-    def callback(hwnd, lParam):
-        try:
-            if IsWindowVisible(hwnd):
-                length = GetWindowTextLengthW(hwnd)
-                if length > 0:
-                    buf = ctypes.create_unicode_buffer(length + 1)
-                    GetWindowTextW(hwnd, buf, length + 1)
-                    title = buf.value.strip()
-                    if title:
-                        pid = wintypes.DWORD()
-                        GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-                        cls = ctypes.create_unicode_buffer(256)
-                        GetClassNameW(hwnd, cls, 256)
-                        app = get_proc_name(int(pid.value))
-                        windows.append(WindowInfo(str(int(hwnd)), title, int(pid.value), app, cls.value))
-        except Exception:
-            pass
-        return True
-
-    EnumWindows(EnumWindowsProc(callback), 0)
-    windows.sort(key=lambda w: ((w.app or "").lower(), w.title.lower()))
+    _enum_windows = windows
+    _enum_app_names = app_names
+    _prune_handle_cache()
+    # One process snapshot for the whole enumeration instead of a lookup per window
+    _enum_pid_names = _snapshot_pid_names() if app_names else {}
+    try:
+        user32.EnumWindows(_ENUM_PROC, 0)
+    finally:
+        _enum_windows = []
+        _enum_pid_names = {}
+        _enum_app_names = True
+    windows.sort(key=attrgetter("sort_key"))
     return windows
 
+# Common GetLastError codes; these skip the FormatMessageW call and its buffer.
+# Fixed English text for the common codes, so FormatMessageW is skipped on the hot failure path.
+# These messages are always English regardless of the system UI language; other codes stay localized.
+_KNOWN_WIN_ERRORS = {
+    5: "Access is denied.",             # ERROR_ACCESS_DENIED
+    6: "The handle is invalid.",        # ERROR_INVALID_HANDLE
+    87: "The parameter is incorrect.",  # ERROR_INVALID_PARAMETER
+}
+
 def _format_last_win_error(prefix: str = "Error") -> str:
-    import ctypes
-    kernel32 = ctypes.windll.kernel32
     err = kernel32.GetLastError()
     if not err:
         return f"{prefix}: Unknown error (GetLastError=0)."
+    known = _KNOWN_WIN_ERRORS.get(err)
+    if known:
+        return f"{prefix}: {known} (Code {err})"
     FORMAT_MESSAGE_FROM_SYSTEM = 0x00001000
     FORMAT_MESSAGE_IGNORE_INSERTS = 0x00000200
     buf = ctypes.create_unicode_buffer(1024)
@@ -119,23 +364,6 @@ def set_always_on_top_windows(hwnd_int: int, enable: bool = True, focus: bool =
     Set or clear topmost on Windows.
     If focus is True, SetForegroundWindow will be called; otherwise the window will not steal focus.
     """
-    import ctypes
-    from ctypes import wintypes
-    user32 = ctypes.windll.user32
-    user32.SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_uint]
-    user32.SetWindowPos.restype = wintypes.BOOL
-    user32.SetForegroundWindow.argtypes = [wintypes.HWND]
-    user32.SetForegroundWindow.restype = wintypes.BOOL
-    user32.ShowWindow.argtypes = [wintypes.HWND, ctypes.c_int]
-    user32.ShowWindow.restype = wintypes.BOOL
-
-    HWND_TOPMOST = wintypes.HWND(-1)
-    HWND_NOTOPMOST = wintypes.HWND(-2)
-    SWP_NOSIZE = 0x0001
-    SWP_NOMOVE = 0x0002
-    SWP_SHOWWINDOW = 0x0040
-    SW_SHOWNOACTIVATE = 4
-
     flags = SWP_NOMOVE | SWP_NOSIZE | SWP_SHOWWINDOW
     target = HWND_TOPMOST if enable else HWND_NOTOPMOST
 
@@ -146,7 +374,7 @@ def set_always_on_top_windows(hwnd_int: int, enable: bool = True, focus: bool =
     ok = user32.SetWindowPos(hwnd, target, 0, 0, 0, 0, flags)
     if not ok:
         msg = _format_last_win_error("SetWindowPos failed")
-        if "Code 5" in msg or "access" in msg.lower():
+        if "(Code 5)" in msg:
             msg += ("\nHint: The target window is likely running with elevated privileges (Administrator). "
                     "Run this script with the same elevated privileges OR start the target app without elevation.")
         raise RuntimeError(msg)
@@ -156,12 +384,123 @@ def set_always_on_top_windows(hwnd_int: int, enable: bool = True, focus: bool =
         except Exception:
             pass
 
+def _is_topmost_now(hwnd: int) -> bool:
+    return bool(user32.GetWindowLongW(hwnd, GWL_EXSTYLE) & WS_EX_TOPMOST)
+
+def _batch_set_topmost(hwnds: list[int], enable: bool, focus: bool = False) -> list[str | None]:
+    """
+    Set or clear topmost for several windows in one DeferWindowPos batch (one DWM update).
+    Returns one entry per hwnd: None on success, otherwise the error message.
+    """
+    if not hwnds:
+        return []
+    # No SWP_SHOWWINDOW here: with it DeferWindowPos repositions none of the windows.
+    # ShowWindow below already makes them visible without activating.
+    flags = SWP_NOMOVE | SWP_NOSIZE
+    target = HWND_TOPMOST if enable else HWND_NOTOPMOST
+
+    for hwnd in hwnds:
+        user32.ShowWindow(hwnd, SW_SHOWNOACTIVATE)
+    hdwp = user32.BeginDeferWindowPos(len(hwnds))
+    for hwnd in hwnds:
+        if not hdwp:
+            break
+        hdwp = user32.DeferWindowPos(hdwp, hwnd, target, 0, 0, 0, 0, flags)
+    ok = bool(hdwp) and bool(user32.EndDeferWindowPos(hdwp))
+
+    results: list[str | None] = []
+    for hwnd in hwnds:
+        if ok and _is_topmost_now(hwnd) == enable:
+            if focus:
+                try:
+                    user32.SetForegroundWindow(hwnd)
+                except Exception:
+                    pass
+            results.append(None)
+            continue
+        # Batch rejected, or this window ignored it (e.g. elevated target):
+        # redo it on its own so it gets a real error message
+        try:
+            set_always_on_top_windows(hwnd, enable, focus=focus)
+            results.append(None)
+        except RuntimeError as e:
+            results.append(str(e))
+    return results
+
 # -------------------------
 # Linux / X11
 # -------------------------
-def list_windows_linux_x11() -> list[WindowInfo]:
+@lru_cache(maxsize=1)
+def _x11_display():
+    """Single X connection for the process lifetime (python-xlib); None if it cannot be opened."""
+    xlib = _get_xlib()
+    if xlib is None:
+        return None
+    try:
+        return xlib.display.Display()
+    except Exception:
+        # e.g. DISPLAY unset; fall back to wmctrl
+        return None
+
+@lru_cache(maxsize=None)
+def _x11_atom(name: str) -> int:
+    return _x11_display().intern_atom(name)
+
+def _x11_text(value) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return str(value or "")
+
+def _list_windows_xlib(app_names: bool = True) -> list[WindowInfo]:
+    d = _x11_display()
+    root = d.screen().root
+    xlib = _get_xlib()
+    clients = root.get_full_property(_x11_atom("_NET_CLIENT_LIST"), xlib.X.AnyPropertyType)
+    net_wm_name = _x11_atom("_NET_WM_NAME")
+    net_wm_pid = _x11_atom("_NET_WM_PID")
+    utf8_string = _x11_atom("UTF8_STRING")
+    windows: list[WindowInfo] = []
+    for wid in (clients.value if clients else []):
+        win = d.create_resource_object("window", wid)
+        try:
+            name = win.get_full_property(net_wm_name, utf8_string)
+            title = _x11_text(name.value) if name else _x11_text(win.get_wm_name())
+            pid_prop = win.get_full_property(net_wm_pid, xlib.Xatom.CARDINAL)
+        except Exception:
+            # Window vanished between listing and property read
+            continue
+        pid = int(pid_prop.value[0]) if pid_prop and len(pid_prop.value) else None
+        app = get_proc_name(pid) if app_names else None
+        windows.append(WindowInfo(f"0x{int(wid):08x}", title.strip() or "<no title>", pid, app, None))
+    return windows
+
+def _xlib_client_message(wid: int, message_type: str, data: list[int]):
+    xlib = _get_xlib()
+    d = _x11_display()
+    win = d.create_resource_object("window", wid)
+    ev = xlib.protocol.event.ClientMessage(window=win, client_type=_x11_atom(message_type),
+                                           data=(32, data + [0] * (5 - len(data))))
+    d.screen().root.send_event(ev, event_mask=xlib.X.SubstructureRedirectMask | xlib.X.SubstructureNotifyMask)
+
+def _set_always_on_top_xlib(wid: int, enable: bool, sticky: bool, focus: bool):
+    action = 1 if enable else 0  # _NET_WM_STATE_ADD / _NET_WM_STATE_REMOVE
+    second = _x11_atom("_NET_WM_STATE_STICKY") if sticky else 0
+    # Source indication 1 = normal application
+    _xlib_client_message(wid, "_NET_WM_STATE", [action, _x11_atom("_NET_WM_STATE_ABOVE"), second, 1])
+    if focus:
+        _xlib_client_message(wid, "_NET_ACTIVE_WINDOW", [1, _get_xlib().X.CurrentTime, 0])
+
+def list_windows_linux_x11(app_names: bool = True) -> list[WindowInfo]:
+    if _x11_display() is not None:
+        windows = _list_windows_xlib(app_names)
+        windows.sort(key=attrgetter("sort_key"))
+        return windows
     if not shutil.which("wmctrl"):
-        raise RuntimeError("wmctrl not found. Install it, e.g.: sudo apt install wmctrl")
+        if _get_xlib() is not None:
+            raise RuntimeError("Cannot open the X display (is DISPLAY set and an X11 session running?) "
+                               "and wmctrl is not installed.")
+        raise RuntimeError("wmctrl not found. Install it, e.g.: sudo apt install wmctrl "
+                           "(or install python-xlib: pip install python-xlib)")
     import subprocess
     proc = subprocess.run(["wmctrl", "-l", "-p"], capture_output=True, text=True, check=True)
     windows: list[WindowInfo] = []
@@ -171,12 +510,12 @@ def list_windows_linux_x11() -> list[WindowInfo]:
             continue
         wid_hex, desktop, pid_str, host, title = parts
         pid = int(pid_str) if pid_str.isdigit() else None
-        app = get_proc_name(pid)
+        app = get_proc_name(pid) if app_names else None
         windows.append(WindowInfo(wid_hex, title.strip() or "<no title>", pid, app, None))
-    windows.sort(key=lambda w: ((w.app or "").lower(), w.title.lower()))
+    windows.sort(key=attrgetter("sort_key"))
     return windows
 
-def set_always_on_top_linux_x11(wid_hex: str, enable: bool = True, sticky: bool = False, focus: bool = False):
+def _set_always_on_top_wmctrl(wid_hex: str, enable: bool, sticky: bool, focus: bool):
     import subprocess
     action = "add" if enable else "remove"
     subprocess.run(["wmctrl", "-i", "-r", wid_hex, "-b", f"{action},above"], check=True)
@@ -185,6 +524,46 @@ def set_always_on_top_linux_x11(wid_hex: str, enable: bool = True, sticky: bool
     if focus:
         subprocess.run(["wmctrl", "-i", "-a", wid_hex], check=True)
 
+WMCTRL_MAX_WORKERS = 8
+
+def set_always_on_top_linux_x11_many(wid_hexes: list[str], enable: bool = True, sticky: bool = False,
+                                     focus: bool = False) -> dict[str, str]:
+    """
+    Set or clear topmost for several X11 windows in one go: a single X sync (python-xlib),
+    or wmctrl calls run concurrently in a thread pool (subprocess waits release the GIL).
+    Returns {window id: error message} for the windows that could not be changed.
+    """
+    if not wid_hexes:
+        return {}
+    failed: dict[str, str] = {}
+    if _x11_display() is not None:
+        for wid_hex in wid_hexes:
+            try:
+                _set_always_on_top_xlib(int(wid_hex, 16), enable, sticky, focus)
+            except Exception as e:
+                failed[wid_hex] = str(e)
+        _x11_display().sync()
+        return failed
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    def apply(wid_hex: str) -> tuple[str, str | None]:
+        try:
+            _set_always_on_top_wmctrl(wid_hex, enable, sticky, focus=False)
+            return wid_hex, None
+        except Exception as e:
+            return wid_hex, str(e)
+
+    with ThreadPoolExecutor(max_workers=min(WMCTRL_MAX_WORKERS, len(wid_hexes))) as ex:
+        failed = {wid_hex: err for wid_hex, err in ex.map(apply, wid_hexes) if err is not None}
+    if focus:
+        # Activate in selection order so the last selected window ends up focused
+        import subprocess
+        for wid_hex in wid_hexes:
+            if wid_hex not in failed:
+                subprocess.run(["wmctrl", "-i", "-a", wid_hex], check=False)
+    return failed
+
 # -------------------------
 # macOS (listing only)
 # -------------------------
@@ -203,9 +582,9 @@ def list_windows_macos() -> list[WindowInfo]:
         pid = w.get("kCGWindowOwnerPID", None)
         title = f"{owner} — {name}" if name else owner
         if title and number:
-            windows.append(WindowInfo(str(int(number)), title.strip(), int(pid) if pid else None, owner, None))
+            windows.append(WindowInfo(int(number), title.strip(), int(pid) if pid else None, owner, None))
     windows = [w for w in windows if w.title and w.pid]
-    windows.sort(key=lambda w: ((w.app or "").lower(), w.title.lower()))
+    windows.sort(key=attrgetter("sort_key"))
     return windows
 
 # -------------------------
@@ -225,11 +604,7 @@ def parse_multi_selection(sel: str, n: int) -> list[int]:
     if sel in ("*", "a", "all", "alle"):
         return list(range(1, n + 1))
 
-    out: list[int] = []
-    def add_idx(i: int):
-        if 1 <= i <= n and i not in out:
-            out.append(i)
-
+    seen: set[int] = set()
     for tok in sel.replace(",", " ").split():
         if "-" in tok:
             try:
@@ -237,29 +612,32 @@ def parse_multi_selection(sel: str, n: int) -> list[int]:
                 start, end = int(start_s), int(end_s)
                 if start > end:
                     start, end = end, start
-                for i in range(start, end + 1):
-                    add_idx(i)
+                # Clip to [1, n] so huge ranges do not materialize out-of-range indices
+                seen.update(range(max(start, 1), min(end, n) + 1))
             except ValueError:
                 continue
         else:
             if tok.isdigit():
-                add_idx(int(tok))
-    out.sort()
-    return out
+                i = int(tok)
+                if 1 <= i <= n:
+                    seen.add(i)
+    return sorted(seen)
 
 def choose_windows_multi(windows: list[WindowInfo]) -> list[WindowInfo]:
     if not windows:
         print("No windows found.")
         return []
-    print("\nFound windows:")
+    # Build the whole list and write it once instead of one print() per window
+    lines = ["\nFound windows:"]
     for i, w in enumerate(windows, 1):
         meta = []
         if w.app: meta.append(w.app)
         if w.pid: meta.append(f"PID {w.pid}")
         if w.extra: meta.append(w.extra)
         m = " • ".join(meta)
-        print(f"[{i:>3}] { _truncate(w.title) }" + (f"  ({m})" if m else ""))
-    print("\nMultiple numbers possible, e.g.: 1 3 5-7   or   *  for all.")
+        lines.append(f"[{i:>3}] { _truncate(w.title) }" + (f"  ({m})" if m else ""))
+    lines.append("\nMultiple numbers possible, e.g.: 1 3 5-7   or   *  for all.")
+    sys.stdout.write("\n".join(lines) + "\n")
     while True:
         sel = input("Select numbers (Enter = cancel): ").strip()
         if not sel:
@@ -278,13 +656,15 @@ def parse_args():
                    help="Do NOT automatically remove topmost status on exit.")
     p.add_argument("-f", "--focus", action="store_true",
                    help="Bring window to foreground when setting topmost (may steal focus).")
+    p.add_argument("--no-app-names", action="store_true",
+                   help="Do not resolve process names (faster listing).")
     return p.parse_args()
 
 def main():
     args = parse_args()
     print(f"Platform: {SYSTEM}")
     if SYSTEM == "Windows":
-        windows = list_windows_windows()
+        windows = list_windows_windows(app_names=not args.no_app_names)
         chosen = choose_windows_multi(windows)
         if not chosen:
             print("Cancelled.")
@@ -292,34 +672,32 @@ def main():
 
         hwnds_ok: list[int] = []
         try:
-            for win in chosen:
-                hwnd = int(win.wid)
-                try:
-                    set_always_on_top_windows(hwnd, True, focus=args.focus)
+            hwnds = [win.wid for win in chosen]
+            results = _batch_set_topmost(hwnds, True, focus=args.focus)
+            for win, hwnd, err in zip(chosen, hwnds, results):
+                if err is None:
                     hwnds_ok.append(hwnd)
                     print(f'↑ Topmost set: \"{_truncate(win.title)}\"  ({win.app or "?"}, PID {win.pid})')
-                except RuntimeError as e:
-                    print(f'⚠️  Could not set for \"{_truncate(win.title)}\": {e}')
+                else:
+                    print(f'⚠️  Could not set for \"{_truncate(win.title)}\": {err}')
 
             if hwnds_ok:
                 print("\nENTER: exit (Auto-Cleanup),  'u'+ENTER: remove topmost for all selected and exit.")
                 cmd = input("> ").strip().lower()
                 if cmd == "u":
-                    for hwnd in hwnds_ok:
-                        try:
-                            set_always_on_top_windows(hwnd, False, focus=args.focus)
-                        except Exception:
-                            pass
+                    try:
+                        _batch_set_topmost(hwnds_ok, False, focus=args.focus)
+                    except Exception:
+                        pass
                     hwnds_ok.clear()
                     print("Topmost removed for all selected windows.")
         finally:
             if hwnds_ok and not args.persist:
                 # Auto-Cleanup
-                for hwnd in hwnds_ok:
-                    try:
-                        set_always_on_top_windows(hwnd, False, focus=args.focus)
-                    except Exception:
-                        pass
+                try:
+                    _batch_set_topmost(hwnds_ok, False, focus=args.focus)
+                except Exception:
+                    pass
                 print("Topmost (Auto-Cleanup) removed for all selected windows.")
     elif SYSTEM == "Linux":
         session = os.environ.get("XDG_SESSION_TYPE", "").lower()
@@ -327,7 +705,7 @@ def main():
             print("Note: Wayland restricts window management. This script requires X11 (Xorg).")
             print("If your desktop session uses Wayland, 'wmctrl' usually does not work reliably.")
             return
-        windows = list_windows_linux_x11()
+        windows = list_windows_linux_x11(app_names=not args.no_app_names)
         chosen = choose_windows_multi(windows)
         if not chosen:
             print("Cancelled.")
@@ -335,32 +713,33 @@ def main():
 
         ids_ok: list[str] = []
         try:
+            try:
+                failed = set_always_on_top_linux_x11_many([w.wid for w in chosen], True, sticky=False, focus=args.focus)
+            except Exception as e:
+                failed = {w.wid: str(e) for w in chosen}
             for win in chosen:
-                try:
-                    set_always_on_top_linux_x11(win.wid, True, sticky=False, focus=args.focus)
+                if win.wid in failed:
+                    print(f'⚠️  Could not set for \"{_truncate(win.title)}\": {failed[win.wid]}')
+                else:
                     ids_ok.append(win.wid)
                     print(f'↑ Topmost set: \"{_truncate(win.title)}\"  ({win.app or "?"}, PID {win.pid})')
-                except Exception as e:
-                    print(f'⚠️  Could not set for \"{_truncate(win.title)}\": {e}')
 
             if ids_ok:
                 print("\nENTER: exit (Auto-Cleanup),  'u'+ENTER: remove topmost for all selected and exit.")
                 cmd = input("> ").strip().lower()
                 if cmd == "u":
-                    for wid in ids_ok:
-                        try:
-                            set_always_on_top_linux_x11(wid, False, sticky=False, focus=args.focus)
-                        except Exception:
-                            pass
+                    try:
+                        set_always_on_top_linux_x11_many(ids_ok, False, sticky=False, focus=args.focus)
+                    except Exception:
+                        pass
                     ids_ok.clear()
                     print("Topmost removed for all selected windows.")
         finally:
             if ids_ok and not args.persist:
-                for wid in ids_ok:
-                    try:
-                        set_always_on_top_linux_x11(wid, False, sticky=False, focus=args.focus)
-                    except Exception:
-                        pass
+                try:
+                    set_always_on_top_linux_x11_many(ids_ok, False, sticky=False, focus=args.focus)
+                except Exception:
+                    pass
                 print("Topmost (Auto-Cleanup) removed for all selected windows.")
     elif SYSTEM == "Darwin":
         print("macOS note: True always-on-top for foreign app windows is not generally available system-wide.")
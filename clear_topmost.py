@@ -13,25 +13,52 @@ Examples:
     python clear_topmost.py -A           # clear ALL topmost windows (confirmation required)
     python clear_topmost.py -A --yes     # clear ALL topmost windows without interactive confirmation
     python clear_topmost.py -t "Note" -f # focus the window before clearing (may change active window)
+    python clear_topmost.py --no-app-names # skip process-name lookup for a faster list
 """
 
 import argparse
 import ctypes
 import platform
+import sys
 from ctypes import wintypes
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import lru_cache
+from operator import attrgetter
 
-# Optional: nicer process names in the list
-try:
-    import psutil  # type: ignore[reportMissingImports]
-except Exception:
-    psutil = None  # type: ignore[assignment]
+# Optional: nicer process names; imported on first use, skipped if not available.
+_psutil = None
+_psutil_tried = False
+
+def _get_psutil():
+    global _psutil, _psutil_tried
+    if not _psutil_tried:
+        _psutil_tried = True
+        try:
+            import psutil  # type: ignore[reportMissingImports]
+            _psutil = psutil
+        except Exception:
+            _psutil = None
+    return _psutil
 
 SYSTEM = platform.system()
 if SYSTEM != "Windows":
     raise SystemExit("This script is for Windows only.")
 
+class PROCESSENTRY32W(ctypes.Structure):
+    _fields_ = [
+        ("dwSize", wintypes.DWORD),
+        ("cntUsage", wintypes.DWORD),
+        ("th32ProcessID", wintypes.DWORD),
+        ("th32DefaultHeapID", ctypes.c_size_t),
+        ("th32ModuleID", wintypes.DWORD),
+        ("cntThreads", wintypes.DWORD),
+        ("th32ParentProcessID", wintypes.DWORD),
+        ("pcPriClassBase", wintypes.LONG),
+        ("dwFlags", wintypes.DWORD),
+        ("szExeFile", wintypes.WCHAR * 260),
+    ]
+
 # Win32 constants & Signatures
 user32 = ctypes.windll.user32
 kernel32 = ctypes.windll.kernel32
@@ -39,12 +66,12 @@ kernel32 = ctypes.windll.kernel32
 GWL_EXSTYLE = -20
 WS_EX_TOPMOST = 0x00000008
 
-user32.EnumWindows.argtypes = [ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM), wintypes.LPARAM]
+EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+user32.EnumWindows.argtypes = [EnumWindowsProc, wintypes.LPARAM]
 user32.EnumWindows.restype = wintypes.BOOL
 user32.IsWindowVisible.argtypes = [wintypes.HWND]
 user32.IsWindowVisible.restype = wintypes.BOOL
-user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
-user32.GetWindowTextLengthW.restype = ctypes.c_int
 user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
 user32.GetWindowTextW.restype = ctypes.c_int
 user32.GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
@@ -57,12 +84,48 @@ user32.SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctyp
 user32.SetWindowPos.restype = wintypes.BOOL
 user32.SetForegroundWindow.argtypes = [wintypes.HWND]
 user32.SetForegroundWindow.restype = wintypes.BOOL
+user32.BeginDeferWindowPos.argtypes = [ctypes.c_int]
+user32.BeginDeferWindowPos.restype = wintypes.HANDLE
+user32.DeferWindowPos.argtypes = [wintypes.HANDLE, wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_uint]
+user32.DeferWindowPos.restype = wintypes.HANDLE
+user32.EndDeferWindowPos.argtypes = [wintypes.HANDLE]
+user32.EndDeferWindowPos.restype = wintypes.BOOL
+kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+kernel32.OpenProcess.restype = wintypes.HANDLE
+kernel32.QueryFullProcessImageNameW.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+kernel32.CloseHandle.restype = wintypes.BOOL
+kernel32.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(wintypes.FILETIME)] * 4
+kernel32.GetProcessTimes.restype = wintypes.BOOL
+kernel32.GetExitCodeProcess.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD)]
+kernel32.GetExitCodeProcess.restype = wintypes.BOOL
+kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+kernel32.WaitForSingleObject.restype = wintypes.DWORD
+kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+kernel32.Process32FirstW.restype = wintypes.BOOL
+kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+kernel32.Process32NextW.restype = wintypes.BOOL
 
 HWND_NOTOPMOST = wintypes.HWND(-2)
 SWP_NOSIZE = 0x0001
 SWP_NOMOVE = 0x0002
 SWP_NOACTIVATE = 0x0010
 SWP_SHOWWINDOW = 0x0040
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+SYNCHRONIZE = 0x00100000
+WAIT_OBJECT_0 = 0x00000000
+WAIT_FAILED = 0xFFFFFFFF
+TH32CS_SNAPPROCESS = 0x00000002
+INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+# Reused by the EnumWindows callback (EnumWindows calls it serially, never re-entrantly)
+_TITLE_BUF = ctypes.create_unicode_buffer(512)
+_CLS_BUF = ctypes.create_unicode_buffer(256)
+_PID = wintypes.DWORD()
 
 @dataclass
 class WindowInfo:
@@ -71,11 +134,29 @@ class WindowInfo:
     pid: int
     app: str | None
     cls: str | None
+    ex_style: int = 0  # GWL_EXSTYLE captured during enumeration
+
+    @property
+    def sort_key(self) -> tuple[str, str]:
+        """(app, title) lower-cased, used to order window lists."""
+        return ((self.app or "").lower(), self.title.lower())
+
+# Common GetLastError codes; these skip the FormatMessageW call and its buffer.
+# Fixed English text for the common codes, so FormatMessageW is skipped on the hot failure path.
+# These messages are always English regardless of the system UI language; other codes stay localized.
+_KNOWN_WIN_ERRORS = {
+    5: "Access is denied.",             # ERROR_ACCESS_DENIED
+    6: "The handle is invalid.",        # ERROR_INVALID_HANDLE
+    87: "The parameter is incorrect.",  # ERROR_INVALID_PARAMETER
+}
 
 def _format_last_win_error(prefix: str = "Error") -> str:
     err = kernel32.GetLastError()
     if not err:
         return f"{prefix}: Unknown error (GetLastError=0)."
+    known = _KNOWN_WIN_ERRORS.get(err)
+    if known:
+        return f"{prefix}: {known} (Code {err})"
     FORMAT_MESSAGE_FROM_SYSTEM = 0x00001000
     FORMAT_MESSAGE_IGNORE_INSERTS = 0x00000200
     buf = ctypes.create_unicode_buffer(1024)
@@ -89,53 +170,184 @@ def _format_last_win_error(prefix: str = "Error") -> str:
 # -------------------------
 # Utilities
 # -------------------------
-@lru_cache(maxsize=512)
+# Open process handles reused across lookups (LRU): pid -> (handle, creation time).
+# Keying by PID alone is safe: Windows does not hand a PID out again while any handle
+# to its process is open, so a cached entry always belongs to the process it was opened
+# for, even after that process has exited. A dead entry therefore only pins its PID;
+# _prune_handle_cache() releases those once per window listing instead of on every lookup.
+PROCESS_HANDLE_CACHE_SIZE = 256
+_handle_cache: OrderedDict[int, tuple[int, int]] = OrderedDict()
+
+def _process_exited(h: int) -> bool:
+    r = kernel32.WaitForSingleObject(h, 0)
+    if r != WAIT_FAILED:
+        return r == WAIT_OBJECT_0
+    # Handle without SYNCHRONIZE access (e.g. protected processes): fall back to the exit
+    # code, which keeps a process that exited with 259 (STILL_ACTIVE) until LRU eviction
+    code = wintypes.DWORD()
+    return not (kernel32.GetExitCodeProcess(h, ctypes.byref(code)) and code.value == STILL_ACTIVE)
+
+def _prune_handle_cache() -> None:
+    """
+    Close cached handles whose process has exited, releasing their PIDs.
+    """
+    for pid, (h, _) in list(_handle_cache.items()):
+        if _process_exited(h):
+            del _handle_cache[pid]
+            kernel32.CloseHandle(h)
+
+def _open_process_cached(pid: int) -> tuple[int, int] | None:
+    """
+    Return (handle, creation time) for pid, opening the process only on a cache miss.
+    """
+    entry = _handle_cache.get(pid)
+    if entry is not None:
+        _handle_cache.move_to_end(pid)
+        return entry
+    h = (kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION | SYNCHRONIZE, False, pid)
+         or kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid))
+    if not h:
+        return None
+    created, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+    if not kernel32.GetProcessTimes(h, ctypes.byref(created), ctypes.byref(exited),
+                                    ctypes.byref(kernel), ctypes.byref(user)):
+        kernel32.CloseHandle(h)
+        return None
+    entry = (h, (created.dwHighDateTime << 32) | created.dwLowDateTime)
+    _handle_cache[pid] = entry
+    if len(_handle_cache) > PROCESS_HANDLE_CACHE_SIZE:
+        _, (old_h, _) = _handle_cache.popitem(last=False)
+        kernel32.CloseHandle(old_h)
+    return entry
+
+def _win_proc_name(pid: int) -> str | None:
+    """
+    Resolve the executable name of a process directly via Win32
+    (QueryFullProcessImageNameW on a cached handle); avoids building a psutil.Process.
+    """
+    entry = _open_process_cached(pid)
+    if entry is None:
+        return None
+    buf = ctypes.create_unicode_buffer(512)
+    size = wintypes.DWORD(len(buf))
+    if not kernel32.QueryFullProcessImageNameW(entry[0], 0, buf, ctypes.byref(size)):
+        return None
+    return buf.value.rsplit("\\", 1)[-1] or None
+
+def _snapshot_pid_names() -> dict[int, str]:
+    """
+    Map PID -> executable name for all running processes using a single
+    Toolhelp32 snapshot. Returns an empty dict if the snapshot fails.
+    """
+    snap = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if not snap or snap == INVALID_HANDLE_VALUE:
+        return {}
+    names: dict[int, str] = {}
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        ok = kernel32.Process32FirstW(snap, ctypes.byref(entry))
+        while ok:
+            names[int(entry.th32ProcessID)] = entry.szExeFile
+            ok = kernel32.Process32NextW(snap, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snap)
+    return names
+
+def _proc_create_time(pid: int) -> int | None:
+    """
+    Process creation time, used to tell a reused PID apart from the original process.
+    """
+    entry = _open_process_cached(pid)
+    return entry[1] if entry else None
+
 def get_proc_name(pid: int | None) -> str | None:
-    if not pid or not psutil:
+    if not pid:
+        return None
+    pid = int(pid)
+    return _get_proc_name_cached(pid, _proc_create_time(pid))
+
+@lru_cache(maxsize=4096)
+def _get_proc_name_cached(pid: int, create_time: int | None) -> str | None:
+    name = _win_proc_name(int(pid))
+    if name:
+        return name
+    psutil = _get_psutil()
+    if not psutil:
         return None
     try:
         return psutil.Process(int(pid)).name()
     except Exception:
         return None
 
-def list_windows() -> list[WindowInfo]:
-    windows: list[WindowInfo] = []
+# State for the shared EnumWindows callback; swapped in by list_windows().
+_enum_windows: list[WindowInfo] = []
+_enum_pid_names: dict[int, str] = {}
+_enum_app_names = True
+_enum_title_filter: str | None = None
 
-    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
-    def cb(hwnd, lparam):
-        try:
-            if not user32.IsWindowVisible(hwnd):
-                return True
-            length = user32.GetWindowTextLengthW(hwnd)
-            if length <= 0:
-                return True
-            buf = ctypes.create_unicode_buffer(length + 1)
-            user32.GetWindowTextW(hwnd, buf, length + 1)
-            title = buf.value.strip()
-            if not title:
-                return True
-            pid = wintypes.DWORD()
-            user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-            cls_buf = ctypes.create_unicode_buffer(256)
-            user32.GetClassNameW(hwnd, cls_buf, 256)
-            app = None
-            if psutil:
-                try:
-                    app = get_proc_name(int(pid.value))
-                except Exception:
-                    app = None
-            windows.append(WindowInfo(int(hwnd), title, int(pid.value), app, cls_buf.value))
-        except Exception:
-            pass
-        return True
+# Module-level so the native callback thunk is created once, not per listing
+@EnumWindowsProc
+def _enum_windows_cb(hwnd, lparam):
+    try:
+        if not user32.IsWindowVisible(hwnd):
+            return True
+        if user32.GetWindowTextW(hwnd, _TITLE_BUF, len(_TITLE_BUF)) <= 0:
+            return True
+        title = _TITLE_BUF.value.strip()
+        if not title:
+            return True
+        # Filter before the PID/class/style/process-name work
+        if _enum_title_filter and _enum_title_filter not in title.lower():
+            return True
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(_PID))
+        pid = int(_PID.value)
+        user32.GetClassNameW(hwnd, _CLS_BUF, len(_CLS_BUF))
+        app = None
+        if _enum_app_names:
+            try:
+                app = _enum_pid_names.get(pid) or get_proc_name(pid)
+            except Exception:
+                app = None
+        ex_style = user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+        _enum_windows.append(WindowInfo(int(hwnd), title, pid, app, _CLS_BUF.value, ex_style))
+    except Exception:
+        pass
+    return True
 
-    user32.EnumWindows(cb, 0)
-    windows.sort(key=lambda w: ((w.app or "").lower(), w.title.lower()))
+def list_windows(app_names: bool = True, title_filter: str | None = None, sort: bool = True) -> list[WindowInfo]:
+    """
+    List visible, titled top-level windows.
+    title_filter: lower-case title substring; non-matching windows are skipped during enumeration.
+    sort: order by (app, title); skip when the caller does not display the full list.
+    """
+    global _enum_windows, _enum_pid_names, _enum_app_names, _enum_title_filter
+    windows: list[WindowInfo] = []
+    _enum_windows = windows
+    _enum_app_names = app_names
+    _enum_title_filter = title_filter
+    _prune_handle_cache()
+    # One process snapshot for the whole enumeration instead of a lookup per window;
+    # with a title filter only the few matches need a name, so look those up directly.
+    _enum_pid_names = _snapshot_pid_names() if app_names and not title_filter else {}
+    try:
+        user32.EnumWindows(_enum_windows_cb, 0)
+    finally:
+        _enum_windows = []
+        _enum_pid_names = {}
+        _enum_app_names = True
+        _enum_title_filter = None
+    if sort:
+        windows.sort(key=attrgetter("sort_key"))
     return windows
 
-def is_topmost(hwnd: int) -> bool:
-    ex = user32.GetWindowLongW(wintypes.HWND(hwnd), GWL_EXSTYLE)
-    return bool(ex & WS_EX_TOPMOST)
+def is_topmost(w: WindowInfo) -> bool:
+    """Topmost state as captured during enumeration."""
+    return bool(w.ex_style & WS_EX_TOPMOST)
+
+def _is_topmost_now(hwnd: int) -> bool:
+    """Current topmost state, read live from the window."""
+    return bool(user32.GetWindowLongW(wintypes.HWND(hwnd), GWL_EXSTYLE) & WS_EX_TOPMOST)
 
 def clear_topmost(hwnd: int, focus: bool = False) -> None:
     """
@@ -154,21 +366,58 @@ def clear_topmost(hwnd: int, focus: bool = False) -> None:
     )
     if not ok:
         msg = _format_last_win_error("SetWindowPos (NOTOPMOST) failed")
-        if "Code 5" in msg or "access" in msg.lower():
+        if "(Code 5)" in msg:
             msg += ("\nHint: The target window is likely running with elevated privileges (Administrator). "
                     "Run this script as Administrator or start the target app without elevation.")
         raise RuntimeError(msg)
 
+def _batch_clear_topmost(hwnds: list[int], focus: bool = False) -> list[str | None]:
+    """
+    Remove topmost from several windows in one DeferWindowPos batch (one DWM update).
+    Returns one entry per hwnd: None on success, otherwise the error message.
+    """
+    if not hwnds:
+        return []
+    if focus:
+        for hwnd in hwnds:
+            try:
+                user32.SetForegroundWindow(wintypes.HWND(hwnd))
+            except Exception:
+                pass
+    # No SWP_SHOWWINDOW here: with it DeferWindowPos repositions none of the windows
+    flags = SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE
+    hdwp = user32.BeginDeferWindowPos(len(hwnds))
+    for hwnd in hwnds:
+        if not hdwp:
+            break
+        hdwp = user32.DeferWindowPos(hdwp, hwnd, HWND_NOTOPMOST, 0, 0, 0, 0, flags)
+    ok = bool(hdwp) and bool(user32.EndDeferWindowPos(hdwp))
+    results: list[str | None] = []
+    for hwnd in hwnds:
+        if ok and not _is_topmost_now(hwnd):
+            results.append(None)
+            continue
+        # Batch rejected, or this window ignored it (e.g. elevated target):
+        # redo it on its own so it gets a real error message
+        try:
+            clear_topmost(hwnd)
+            results.append(None)
+        except RuntimeError as e:
+            results.append(str(e))
+    return results
+
 def choose_window(windows: list[WindowInfo]) -> WindowInfo | None:
-    print("\nFound windows:")
+    # Build the whole list and write it once instead of one print() per window
+    lines = ["\nFound windows:"]
     for i, w in enumerate(windows, 1):
         meta = []
         if w.app: meta.append(w.app)
         if w.pid: meta.append(f"PID {w.pid}")
         if w.cls: meta.append(w.cls)
         m = " • ".join(meta)
-        mark = " [TOPMOST]" if is_topmost(w.hwnd) else ""
-        print(f"[{i:>3}] {w.title}{mark}" + (f"  ({m})" if m else ""))
+        mark = " [TOPMOST]" if is_topmost(w) else ""
+        lines.append(f"[{i:>3}] {w.title}{mark}" + (f"  ({m})" if m else ""))
+    sys.stdout.write("\n".join(lines) + "\n")
     while True:
         sel = input("\nChoose number (or Enter to cancel): ").strip()
         if not sel:
@@ -183,12 +432,16 @@ def parse_args():
     ap.add_argument("-A", "--all", action="store_true", help="Clear ALL topmost windows (use with caution).")
     ap.add_argument("--yes", action="store_true", help="Skip confirmation prompts (use with care).")
     ap.add_argument("-f", "--focus", action="store_true", help="Bring window to foreground before clearing (may steal focus).")
+    ap.add_argument("--no-app-names", action="store_true", help="Do not resolve process names (faster listing).")
     return ap.parse_args()
 
 def main():
     args = parse_args()
 
-    wins = list_windows()
+    # --all ignores --title, so only prefilter for the title-based lookup
+    title_filter = args.title.lower() if args.title and not args.all else None
+    # A title lookup usually yields a single match, so the (app, title) sort is wasted there
+    wins = list_windows(app_names=not args.no_app_names, title_filter=title_filter, sort=title_filter is None)
 
     if args.all:
         if not args.yes:
@@ -196,26 +449,27 @@ def main():
             if confirm != "y":
                 print("Aborted.")
                 return
+        # Only topmost windows need a SetWindowPos; everything else is skipped without a syscall
+        targets = [w for w in wins if is_topmost(w)]
+        results = _batch_clear_topmost([w.hwnd for w in targets], focus=args.focus)
         count = 0
-        for w in wins:
-            if is_topmost(w.hwnd):
-                try:
-                    clear_topmost(w.hwnd, focus=args.focus)
-                    print(f'Cleared: \"{w.title}\" (PID {w.pid}, {w.app or "?"})')
-                    count += 1
-                except Exception as e:
-                    print(f'Error for \"{w.title}\": {e}')
+        for w, err in zip(targets, results):
+            if err is None:
+                print(f'Cleared: \"{w.title}\" (PID {w.pid}, {w.app or "?"})')
+                count += 1
+            else:
+                print(f'Error for \"{w.title}\": {err}')
         print(f"Done. Cleared {count} windows.")
         return
 
     target: WindowInfo | None = None
     if args.title:
-        needle = args.title.lower()
-        matches = [w for w in wins if needle in w.title.lower()]
+        matches = wins  # already filtered during enumeration
         if not matches:
             print(f'No window found with title fragment \"{args.title}\".')
             return
         if len(matches) > 1:
+            matches.sort(key=attrgetter("sort_key"))
             print(f'Multiple matches for \"{args.title}\":')
             target = choose_window(matches)
         else:
@@ -227,7 +481,8 @@ def main():
         print("Cancelled.")
         return
 
-    if not is_topmost(target.hwnd):
+    # The listed ex_style predates the prompt; re-read it for the one window we act on
+    if not _is_topmost_now(target.hwnd):
         print(f'"{target.title}" is not topmost – nothing to do.')
         return
 